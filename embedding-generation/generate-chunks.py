@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import argparse
+import atexit
+import hashlib
 import sys
 import os
 import re
@@ -20,20 +22,49 @@ import uuid
 import yaml
 import csv
 import datetime
-import json
+import threading
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import boto3
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, ClientError
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
+import requests_cache
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+# Prefer the libyaml C bindings for writing chunks, falling back to the pure-Python dumper
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
+# Prefer orjson for reading the large intrinsics JSON files, falling back to the standard library
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 
 # Create a session with retry logic for resilient HTTP requests
-def create_retry_session(retries=5, backoff_factor=1, status_forcelist=(500, 502, 503, 504)):
-    """Create a requests session with automatic retry on failures."""
-    session = requests.Session()
+def create_retry_session(retries=5, backoff_factor=1, status_forcelist=(500, 502, 503, 504), cache_name=None):
+    """Create a requests session with automatic retry on failures.
+
+    If cache_name is given, responses are cached in a local SQLite database of that name for a day,
+    revalidating with the server (ETag/Last-Modified) where it supports it.
+    """
+    if cache_name:
+        session = requests_cache.CachedSession(
+            cache_name,
+            backend='sqlite',
+            expire_after=86400,
+            allowable_methods=('GET', 'HEAD'),
+            cache_control=True
+        )
+    else:
+        session = requests.Session()
     retry = Retry(
         total=retries,
         read=retries,
@@ -42,45 +73,68 @@ def create_retry_session(retries=5, backoff_factor=1, status_forcelist=(500, 502
         status_forcelist=status_forcelist,
         allowed_methods=["HEAD", "GET", "OPTIONS"]
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    # Size the connection pool to cover both worker pools below
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=32, pool_maxsize=32)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
 
-# Global session for all HTTP requests
-http_session = create_retry_session()
+# Global session for all HTTP requests, created in main; responses are cached in scrape_cache across runs unless --no-cache is passed
+scrape_cache = '.scrape_cache'
+http_session = None
+
+# Worker pools for the learning path crawl. Pages are fetched on one pool and the markdown
+# files they link to on the other, so a page task never blocks waiting on its own pool.
+MAX_WORKERS = 16
+page_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+markdown_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
 
 
 def ensure_intrinsic_chunks_from_s3(local_folder='intrinsic_chunks',
                                     s3_bucket='arm-github-copilot-extension',
-                                    s3_prefix='embedding_data/intrinsic_chunks/'):
+                                    s3_prefix='embedding_data/intrinsic_chunks/',
+                                    max_workers=32):
     """
     Ensure the local 'intrinsic_chunks' folder exists and is populated with files from S3.
-    If the folder does not exist, create it and download all files from the S3 prefix.
+    Only files under the S3 prefix that are missing locally are downloaded, so an interrupted
+    download is completed on the next run.
     """
-    if not os.path.exists(local_folder):
-        os.makedirs(local_folder, exist_ok=True)
-        print(f"Created local folder: {local_folder}")
-        s3 = boto3.client('s3')
-        try:
-            paginator = s3.get_paginator('list_objects_v2')
-            for page in paginator.paginate(Bucket=s3_bucket, Prefix=s3_prefix):
-                for obj in page.get('Contents', []):
-                    key = obj['Key']
-                    if key.endswith('/'):
-                        continue  # skip folders
-                    filename = os.path.basename(key)
-                    local_path = os.path.join(local_folder, filename)
-                    print(f"Downloading {key} to {local_path}")
-                    s3.download_file(s3_bucket, key, local_path)
-        except NoCredentialsError:
-            print("AWS credentials not found. Please configure them.")
-        except ClientError as e:
-            print(f"S3 ClientError: {e}")
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-    else:
-        print(f"Folder '{local_folder}' already exists. Skipping S3 download.")
+    os.makedirs(local_folder, exist_ok=True)
+    existing = {entry.name for entry in os.scandir(local_folder) if entry.is_file()}
+
+    # The client is shared by all download threads, so give it enough pooled connections
+    s3 = boto3.client('s3', config=Config(max_pool_connections=max_workers * 2))
+
+    def download(key, local_path):
+        print(f"Downloading {key} to {local_path}")
+        s3.download_file(s3_bucket, key, local_path)
+
+    try:
+        downloads = []
+        paginator = s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=s3_bucket, Prefix=s3_prefix):
+            for obj in page.get('Contents', []):
+                key = obj['Key']
+                if key.endswith('/'):
+                    continue  # skip folders
+                filename = os.path.basename(key)
+                if filename not in existing:
+                    downloads.append((key, os.path.join(local_folder, filename)))
+
+        if not downloads:
+            print(f"Folder '{local_folder}' is up to date with S3. Skipping S3 download.")
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(download, key, local_path) for key, local_path in downloads]
+            for future in as_completed(futures):
+                future.result()
+    except NoCredentialsError:
+        print("AWS credentials not found. Please configure them.")
+    except ClientError as e:
+        print(f"S3 ClientError: {e}")
+    except Exception as e:
+        print(f"Unexpected error: {e}")
 
 '''
 To fix:
@@ -88,43 +142,76 @@ To fix:
 2. Learning Path titles must come from index page...send through function along with Graviton.
 '''
 
+# Learning path site and the raw GitHub content it is built from (no trailing slashes)
+learn_site = "https://learn.arm.com"
+learning_paths_github_raw = "https://raw.githubusercontent.com/ArmDeveloperEcosystem/arm-learning-paths/refs/heads/production/content"
+
 yaml_dir = 'yaml_data'
 details_file = 'info/chunk_details.csv'
+errors_file = 'info/errors.csv'
+
+# Chunk details per URL, kept in memory and written to details_file once at exit
+details_rows = {}
+
+# Chunks per URL; each URL's YAML file in yaml_dir is rewritten with all of them once its pages are chunked
+chunks_by_url = {}
+
+# (url, error) rows, kept in memory and appended to errors_file once at exit
+error_rows = []
 
 chunk_index = 1
 
 # Global var to prevent duplication entries from cross platform learning paths
 cross_platform_lps_dont_duplicate = []
 
+# Guards the global state above, which is shared between worker threads
+state_lock = threading.Lock()
+
+# Serializes chunk file writes so an older snapshot of a URL's chunks never replaces a newer one
+chunk_file_lock = threading.Lock()
+
 # Increase the file size limit, which defaults to '131,072'
 csv.field_size_limit(10**9) #1,000,000,000 (1 billion), smaller than 64-bit space but avoids 'python overflowerror'
 
+# Regexes used while converting and chunking text, compiled once rather than per call
+# Single pass over an operation's HTML: drop a leading 'Operation' header, turn <pre> blocks into inline code,
+# end other headers with a newline, and strip every other tag
+HTML_TO_MARKDOWN_RE = re.compile(r'\A<h4>Operation</h4>|(?s:<pre>(.*?)</pre>)|<h[1-6]>(.*?)</h[1-6]>|<.*?>')
+HTML_TAG_RE = re.compile(r'<.*?>')
+
+# Places markdown can be split: paragraph breaks and h2-h4 headings
+SECTION_BREAK_RE = re.compile(r'\n\n|^(#{2,4}) ', re.MULTILINE)
+
+# Compiler flag and header file to use each intrinsic SIMD_ISA
+ISA_BUILD_DETAILS = {
+    'Neon': ('-march=armv8-a+simd', '#include <arm_neon.h>'),
+    'sve':  ('-march=armv8-a+sve',  '#include <arm_sve.h>'),
+    'sve2': ('-march=armv8-a+sve2', '#include <arm_sve.h>'),
+}
+
+# Limit HTML parsing to the elements each page is searched for. Pages that are searched for
+# several unrelated elements (learning path and install guide pages) are parsed in full.
+TABLE_ROW_STRAINER = SoupStrainer('tr')                 # ecosystem dashboard rows and their detail rows
+LINK_STRAINER = SoupStrainer('a', href=True)            # learn.arm.com category cards
+PATH_CARD_STRAINER = SoupStrainer(class_='path-card')   # learning paths in a category
+TOOL_CARD_STRAINER = SoupStrainer(class_='tool-card')   # install guides
+
+@dataclass(slots=True)
 class Chunk:
-    def __init__(self, title, url, uuid, keywords, content):
-        self.title = title
-        self.url = url
-        self.uuid = uuid
-        self.content = content
-
-        # Translate keyword list into comma-seperated string, and add similar words to keywords.
-        self.keywords = self.formatKeywords(keywords)
-    
+    title: str
+    url: str
+    uuid: str
+    keywords: str   # comma-seperated, lowercase
+    content: str
 
-    def formatKeywords(self,keywords):
-        return ', '.join(keywords).lower().strip()
+    @classmethod
+    def create(cls, title, url, uuid, keywords, content):
+        # Translate keyword list into comma-seperated string
+        return cls(title, url, uuid, ', '.join(keywords).lower().strip(), content)
 
     # Used to dump into a yaml file without difficulty
     def toDict(self):
-        return {
-            'title': self.title,
-            'url': self.url,
-            'uuid': self.uuid,
-            'keywords': self.keywords,
-            'content': self.content
-        }
-
-    def __repr__(self):
-        return f"Chunk(title={self.title}, focus={self.focus}, url={self.url}, uuid={self.uuid}, display_name={self.display_name}, content={self.content})"
+        return asdict(self)
 
 def createEcosystemDashboardChunks():
     ''' Format of Chunk text_snippet:
@@ -150,14 +237,13 @@ def createEcosystemDashboardChunks():
 
         # Get individual links to help
         quick_start_links_div = works_on_arm_div.parent.find_next_sibling('section').find('div', class_='description')
-        li_elements = quick_start_links_div.find_all('li')
+        quick_start_links = quick_start_links_div.select('li a')
         get_started_text = ""
-        if li_elements:
-            get_started_text = "\n\nTo get started quickly, here are some helpful guides from different sources:\n"
-            for li in quick_start_links_div.find_all('li'):
-                get_started_text = get_started_text + f"- [{li.find('a').get_text()}]({li.find('a').get('href')})\n"
-        
-        
+        if quick_start_links:
+            parts = ["\n\nTo get started quickly, here are some helpful guides from different sources:\n"]
+            parts.extend(f"- [{a.get_text()}]({a.get('href')})\n" for a in quick_start_links)
+            get_started_text = ''.join(parts)
+
 
         text_snippet = f"{arm_support_statement}\n\n[Download {package_name} here.]({download_url}){get_started_text}"
         return text_snippet
@@ -165,7 +251,7 @@ def createEcosystemDashboardChunks():
     # Obtain all
     url = "https://www.arm.com/developer-hub/ecosystem-dashboard/"
     response = http_session.get(url, timeout=60)
-    soup = BeautifulSoup(response.text, 'html.parser')
+    soup = BeautifulSoup(response.content, 'lxml', parse_only=TABLE_ROW_STRAINER)
     rows = soup.find_all('tr', class_=['main-sw-row']) 
     for row in rows:
         # Obtain details for text snippet
@@ -180,7 +266,7 @@ def createEcosystemDashboardChunks():
                 keywords.append(c.replace('tag-license-','').replace('tag-category-',''))
 
 
-        chunk = Chunk(
+        chunk = Chunk.create(
             title        = f"Ecosystem Dashboard - {package_name}",
             url          = f"{url}?package={package_name_urlized}",
             uuid         = str(uuid.uuid4()),
@@ -190,24 +276,21 @@ def createEcosystemDashboardChunks():
 
         chunkSaveAndTrack(url,chunk) 
 
+    writeChunkFile(url)
     return 
 
 
 def createIntrinsicsDatabaseChunks():
-    def htmlToMarkdown(html_string):
-        # Step 0: Remove '<h4>Operation</h4>' as it isn't needed
-        html_string = re.sub(r'^<h4>Operation</h4>', '', html_string)
+    def htmlToMarkdownReplacement(match):
+        code, header = match.group(1, 2)
+        if code is not None:
+            return f"`{HTML_TAG_RE.sub('', code)}`"
+        if header is not None:
+            return HTML_TAG_RE.sub('', header) + '\n'
+        return ''
 
-        # Step 1: Replace <pre> tags with backticks for code block
-        html_string = re.sub(r'<pre>(.*?)</pre>', r'`\1`', html_string, flags=re.DOTALL)
-        
-        # Step 2: Add newline after headers (like <h1>, <h2>, <h3>, etc.)
-        html_string = re.sub(r'<h[1-6]>(.*?)</h[1-6]>', r'\1\n', html_string)
-        
-        # Step 3: Remove all other HTML tags
-        html_string = re.sub(r'<.*?>', '', html_string)
-        
-        return html_string
+    def htmlToMarkdown(html_string):
+        return HTML_TO_MARKDOWN_RE.sub(htmlToMarkdownReplacement, html_string)
 
 
 
@@ -221,62 +304,63 @@ def createIntrinsicsDatabaseChunks():
 
     # Read in .json files
     intrinsics_directory_path = os.getenv('INTRINSICS_DATAPATH')
-    with open(intrinsics_directory_path+'/intrinsics.json', 'r') as file:
-        intrinsics = json.load(file)
-    with open(intrinsics_directory_path+'/operations.json', 'r') as file:
-        operations = json.load(file)
+    with open(intrinsics_directory_path+'/intrinsics.json', 'rb') as file:
+        intrinsics = json_loads(file.read())
+    with open(intrinsics_directory_path+'/operations.json', 'rb') as file:
+        operations = json_loads(file.read())
 
-    for intrinsic in intrinsics:
-        intrinsic_content = f"The `{intrinsic['name']}` intrinsic is part of the {intrinsic['SIMD_ISA']} instruction set architecture."
+    # Index operations by ID once, rather than searching the list for every intrinsic
+    operation_by_id = {}
+    for item in operations:
+        operation_by_id.setdefault(item["item"]["id"], item["item"]["content"])
 
+    for intrinsic in intrinsics:
         # Only include aarch64 intrinsics
         if 'A64' in intrinsic['Architectures']:
+            # Content is collected in parts and joined once at the end
+            parts = [f"The `{intrinsic['name']}` intrinsic is part of the {intrinsic['SIMD_ISA']} instruction set architecture."]
+
             description = intrinsic['description']
             # Exclude descriptions that don't exist or are simply 'Add' or 'Vector move'
             if (len(description.split(' ')) > 5):
-                intrinsic_content += f" Here is a brief intrinsic description: {description}\n\n"
+                parts.append(f" Here is a brief intrinsic description: {description}\n\n")
 
             # Define signature:
             signature = f"{intrinsic['return_type']['value']} {intrinsic['name']} ({', '.join(intrinsic['arguments'])});"
-            intrinsic_content += f"The signature for this intrinsic function is as follows:\n`{signature}`\n\n"
+            parts.append(f"The signature for this intrinsic function is as follows:\n`{signature}`\n\n")
 
             # Tell how to use:
-            intrinsic_content += f"To use this {intrinsic['SIMD_ISA']} intrinsic, add the following to your C/C++ project:\n"
-            intrinsic_content += f"1. Add compiler flags to ensure architecture-specific optimizations are present (for both GCC and ArmClang):\n"
-            if (intrinsic['SIMD_ISA'] == 'Neon'):
-                intrinsic_content += f'`-march=armv8-a+simd`'
-            elif (intrinsic['SIMD_ISA'] == 'sve'):
-                intrinsic_content += f'`-march=armv8-a+sve`'
-            elif (intrinsic['SIMD_ISA'] == 'sve2'):
-                intrinsic_content += f'`-march=armv8-a+sve2`'
-            else:
+            parts.append(f"To use this {intrinsic['SIMD_ISA']} intrinsic, add the following to your C/C++ project:\n")
+            build_details = ISA_BUILD_DETAILS.get(intrinsic['SIMD_ISA'])
+            if build_details is None:
                 print('Intrinsic processing issue. resolve and run script again. Intrinsic SIMD_ISA: ',intrinsic['SIMD_ISA'])
                 sys.exit(0)
-            intrinsic_content += f'\n2. Add the now included .h header file containing the intrinsic:\n'
-            if ({intrinsic['SIMD_ISA']} == 'Neon'):
-                intrinsic_content += f'`#include <arm_neon.h>`'
-            else:
-                intrinsic_content += f'`#include <arm_sve.h>`'
-            intrinsic_content += "\nYou can enable more specific microarchitectural optimizations (such as instruction scheduling, vectorization, and cache usage patterns) using the -mcpu flag and specifying the CPU in your machine.\n\n"
+            march_flag, header = build_details
+            parts.append("1. Add compiler flags to ensure architecture-specific optimizations are present (for both GCC and ArmClang):\n")
+            parts.append(f'`{march_flag}`')
+            parts.append('\n2. Add the now included .h header file containing the intrinsic:\n')
+            parts.append(f'`{header}`')
+            parts.append("\nYou can enable more specific microarchitectural optimizations (such as instruction scheduling, vectorization, and cache usage patterns) using the -mcpu flag and specifying the CPU in your machine.\n\n")
 
             # Sudocode if present
             if 'Operation' in intrinsic:
                 op_id = intrinsic['Operation']
-                operation_text = next((item["item"]["content"] for item in operations if item["item"]["id"] == op_id), None)
+                operation_text = operation_by_id.get(op_id)
                 if operation_text:
-                    intrinsic_content += f'This is the sudocode for how the {intrinsic["name"]} intrinsic operates:\n'
-                    intrinsic_content += htmlToMarkdown(operation_text)
+                    parts.append(f'This is the sudocode for how the {intrinsic["name"]} intrinsic operates:\n')
+                    parts.append(htmlToMarkdown(operation_text))
                 else:
                     print('Operation matching issue. Resolve and run script again. Operation ID: ',op_id)
                     sys.exit(0)
 
+            intrinsic_content = ''.join(parts)
 
             keywords = [intrinsic['name'], intrinsic['SIMD_ISA'], intrinsic['instruction_group'].replace('|',', '), 'Intrinsic', 'SSE', 'AVX', 'Streaming SIMD Extension']
 
             url = "https://developer.arm.com/architectures/instruction-sets/intrinsics/"
             
             
-            chunk = Chunk(
+            chunk = Chunk.create(
                 title        = f"Arm Intrinsics - {intrinsic['name']}",
                 url          = f"{url}#q={intrinsic['name']}",
                 uuid         = str(uuid.uuid4()),
@@ -285,6 +369,8 @@ def createIntrinsicsDatabaseChunks():
             )
 
             chunkSaveAndTrack(url,chunk) 
+
+    writeChunkFile(url)
     
     '''
     content:
@@ -312,46 +398,46 @@ def createIntrinsicsDatabaseChunks():
 
 
 def processLearningPath(url,type):
-    github_raw_link = "https://raw.githubusercontent.com/ArmDeveloperEcosystem/arm-learning-paths/refs/heads/production/content"
-    site_link = "https://learn.arm.com"
-
     def chunkizeLearningPath(relative_url, title, keywords):
         if relative_url.endswith('/'):
             relative_url = relative_url[:-1]
-        MARKDOWN_url = github_raw_link + relative_url + '.md'
-        WEBSITE_url = site_link + relative_url
+        MARKDOWN_url = learning_paths_github_raw + relative_url + '.md'
+        WEBSITE_url = learn_site + relative_url
 
 
         # 3) Extract markdown, skipping those that are 404ing
-        if not URLIsValidCheck(MARKDOWN_url):
-            return 
         markdown = obtainMarkdownContentFromGitHubMDFile(MARKDOWN_url)
+        if markdown is None:
+            return 
 
         # 4) Get sized text snippets the markdown
         text_snippets = obtainTextSnippets__Markdown(markdown)
 
         # 5) Create chunks for each snippet by adding metadata 
-        for text_snippet in text_snippets:
+        for text_snippet, words in text_snippets:
             chunk = createChunk(text_snippet, WEBSITE_url, keywords, title)
 
-            chunkSaveAndTrack(WEBSITE_url,chunk) 
+            chunkSaveAndTrack(WEBSITE_url,chunk,words) 
+
+        writeChunkFile(WEBSITE_url)
 
 
     if type == 'Learning Path':
         # Prevent duplicate logging of cross-platform learningpaths via a local list. Check if URL is already in list. If so, move past URL. If not, add it and continue processing.
         if 'cross-platform' in url:
-            if url in cross_platform_lps_dont_duplicate:
-                print('NOT PROCESSING ',url,' already in list')
-                # Don't process URL
-                return
-            else:
+            with state_lock:
+                if url in cross_platform_lps_dont_duplicate:
+                    print('NOT PROCESSING ',url,' already in list')
+                    # Don't process URL
+                    return
                 print('Cross platform URL being added to list: ',url)
                 cross_platform_lps_dont_duplicate.append(url)
 
 
 
         response = http_session.get(url, timeout=60)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml')
+        hrefs = []
         for link in soup.find_all(class_='inner-learning-path-navbar-element'):
             #Ignore mobile links
             if 'content-individual-a-mobile' not in link.get('class', []): 
@@ -364,32 +450,33 @@ def processLearningPath(url,type):
                 if href.split('/')[-1].startswith('_'):
                     continue
 
-                # Obtain title of learning path
-                title = 'Arm Learning Path - '+soup.find(id='learning-path-title').get_text()
+                hrefs.append(href)
 
-                # Obtain keywords of learning path
-                ads_tags = soup.findAll('ads-tag')
-                keywords = []
-                for tag in ads_tags:
-                    keyword = tag.get_text().strip()
-                    if keyword not in keywords:
-                        keywords.append(keyword)
+        if not hrefs:
+            return
 
+        # Obtain title of learning path
+        title = 'Arm Learning Path - '+soup.find(id='learning-path-title').get_text()
 
-                chunkizeLearningPath(href,title,keywords)
+        # Obtain keywords of learning path
+        ads_tags = soup.findAll('ads-tag')
+        keywords = []
+        for tag in ads_tags:
+            keyword = tag.get_text().strip()
+            if keyword not in keywords:
+                keywords.append(keyword)
+
+        # Fetch and chunk every page of the learning path concurrently
+        futures = [markdown_executor.submit(chunkizeLearningPath, href, title, keywords) for href in hrefs]
+        for future in as_completed(futures):
+            future.result()
     
     
     elif type == "Install Guide":
-        igs_response = http_session.get(site_link+url, timeout=60)
-        igs_soup = BeautifulSoup(igs_response.text, 'html.parser')
-        for ig_card in igs_soup.find_all(class_="tool-card"):
-            ig_rel_url = ig_card.get('link')
-            ig_url = site_link + ig_rel_url
-
-            
-            
+        def processInstallGuide(ig_rel_url):
+            ig_url = learn_site + ig_rel_url
             ig_response = http_session.get(ig_url, timeout=60)
-            ig_soup = BeautifulSoup(ig_response.text, 'html.parser')
+            ig_soup = BeautifulSoup(ig_response.content, 'lxml')
             
             # obtain title of Install Guide
             title = 'Install Guide - '+ ig_soup.find(id='install-guide-title').get_text()
@@ -413,18 +500,38 @@ def processLearningPath(url,type):
             else:
                 chunkizeLearningPath(ig_rel_url,title, keywords)
 
+        igs_response = http_session.get(learn_site+url, timeout=60)
+        igs_soup = BeautifulSoup(igs_response.content, 'lxml', parse_only=TOOL_CARD_STRAINER)
+
+        # Each guide is fetched and parsed on its own worker, so parsing one page overlaps with fetching the next
+        futures = [markdown_executor.submit(processInstallGuide, ig_card.get('link')) for ig_card in igs_soup.find_all(class_="tool-card")]
+        for future in as_completed(futures):
+            future.result()
+
 
 def createLearningPathChunks():
+    # Process Install Guides separately (directly from /install-guides page), in the background
+    # while the index page below is fetched and parsed
+    futures = [page_executor.submit(processLearningPath, "/install-guides", "Install Guide")]
+
     # Find all categories to iterate over
-    learn_url = "https://learn.arm.com/"
-    response = http_session.get(learn_url, timeout=60)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    
-    # Process Install Guides separately (directly from /install-guides page)
-    processLearningPath("/install-guides", "Install Guide")
+    response = http_session.get(learn_site + '/', timeout=60)
+    soup = BeautifulSoup(response.content, 'lxml', parse_only=LINK_STRAINER)
+
+    def getLearningPathURLs(cat_url):
+        cat_response = http_session.get(cat_url, timeout=60)
+        cat_soup = BeautifulSoup(cat_response.content, 'lxml', parse_only=PATH_CARD_STRAINER)
+        lp_urls = []
+        for lp_card in cat_soup.find_all(class_="path-card"):
+            lp_link = lp_card.get('link')
+            if lp_link is None:
+                continue
+            lp_urls.append(learn_site + lp_link)
+        return lp_urls
     
     # Find category links - main-topic-card elements are now wrapped in <a> tags
     # Look for <a> tags that contain main-topic-card divs
+    cat_futures = []
     for a_tag in soup.find_all('a', href=True):
         card = a_tag.find(class_='main-topic-card')
         if card:
@@ -435,39 +542,28 @@ def createLearningPathChunks():
             if not cat_rel_path.startswith('/learning-paths/'):
                 continue
             
-            cat_response = http_session.get(learn_url.rstrip('/') + cat_rel_path, timeout=60)
-            cat_soup = BeautifulSoup(cat_response.text, 'html.parser')
-            for lp_card in cat_soup.find_all(class_="path-card"):
-                lp_link = lp_card.get('link')
-                if lp_link is None:
-                    continue
-                lp_url = learn_url.rstrip('/') + lp_link
-                # Chunking step
-                processLearningPath(lp_url, "Learning Path")
-
+            cat_futures.append(page_executor.submit(getLearningPathURLs, learn_site + cat_rel_path))
 
-def readInCSV(csv_file):
-    csv_length = 0
-    csv_dict = {
-        'urls': [],
-        'focus': [],
-        'source_names': []
-    }
-    with open(csv_file, 'r') as file:
-        next(file)  # Skip the header row
-        for line in file:
+    # Chunking step, started for each learning path as soon as its category page is in
+    for cat_future in as_completed(cat_futures):
+        for lp_url in cat_future.result():
+            futures.append(page_executor.submit(processLearningPath, lp_url, "Learning Path"))
 
-            source_name = line.strip().split(',')[2]  # Get the URL from column A
-            focus = line.strip().split(',')[4]  # Get the URL from column B
-            url = line.strip().split(',')[3]  # Get the URL from column C
+    for future in as_completed(futures):
+        future.result()
 
-            csv_dict['urls'].append(url)
-            csv_dict['focus'].append(focus)
-            csv_dict['source_names'].append(source_name)
 
-            csv_length += 1
+def readInCSV(csv_file):
+    """Return a (source_name, focus, url) tuple for each row of the CSV file."""
+    rows = []
+    with open(csv_file, 'r', newline='') as file:
+        reader = csv.reader(file)
+        next(reader)  # Skip the header row
+        for row in reader:
+            # Columns: Site Name, License Type, Display Name, URL, Keywords
+            rows.append((row[2], row[4], row[3]))
 
-    return csv_dict, csv_length
+    return rows
 
 
 def getMarkdownGitHubURLsFromPage(url):
@@ -501,28 +597,32 @@ def getMarkdownGitHubURLsFromPage(url):
     return GH_urls, SITE_urls
 
 
-def URLIsValidCheck(url):
+def recordError(url, err):
+    with state_lock:
+        error_rows.append((url, str(err)))
+
+
+def flushErrors():
+    if not error_rows:
+        return
+    with open(errors_file, 'a', newline='') as csvfile:
+        csv_writer = csv.writer(csvfile)
+        csv_writer.writerows(error_rows)
+
+
+def obtainMarkdownContentFromGitHubMDFile(gh_url):
+    """Return the markdown at gh_url without its frontmatter, or None (logging the error) if it can't be fetched."""
     try:
-        response = http_session.get(url, timeout=60)
+        response = http_session.get(gh_url, timeout=60)
         response.raise_for_status()  # Ensure we got a valid response
-        return True
     except requests.exceptions.HTTPError as http_err:
         print(f"HTTP error occurred: {http_err}")
-        with open('info/errors.csv', 'a', newline='') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow([url,str(http_err)])
-        return False
+        recordError(gh_url, http_err)
+        return None
     except Exception as err:
         print(f"Other error occurred: {err}")
-        with open('info/errors.csv', 'a', newline='') as csvfile:
-            csv_writer = csv.writer(csvfile)
-            csv_writer.writerow([url,str(err)])
-        return False
-
-
-def obtainMarkdownContentFromGitHubMDFile(gh_url):
-    response = http_session.get(gh_url, timeout=60)
-    response.raise_for_status()  # Ensure we got a valid response
+        recordError(gh_url, err)
+        return None
     md_content = response.text
 
 
@@ -533,93 +633,62 @@ def obtainMarkdownContentFromGitHubMDFile(gh_url):
 
 
 def obtainTextSnippets__Markdown(content, min_words=300, max_words=500, min_final_words=200):
-    """Split content into chunks based on headers and word count constraints."""
-
-    # Helper function to count words
-    def word_count(text):
-        return len(text.split())
-
-    # Helper function to split content by a given heading level (e.g., h2, h3, h4)
-    def split_by_heading(content, heading_level):
-        pattern = re.compile(rf'(?<=\n)({heading_level} .+)', re.IGNORECASE)
-        return pattern.split(content)
-
-        # Helper function to chunk content
-    def create_chunks(content_pieces, heading_level='##'):
-        """
-        Create chunks from content pieces based on the word count limits.
-        """
-        chunks = []
-        current_chunk = ""
-        current_word_count = 0
-
-        for piece in content_pieces:
-            piece_word_count = word_count(piece)
-
-            # Check if the current piece starts with the heading level, indicating the start of a new section
-            if re.match(rf'^{heading_level} ', piece.strip()):
-                # If the current chunk has enough words, finalize it and start a new chunk
-                if current_word_count >= min_words:
-                    chunks.append(current_chunk.strip())
-                    current_chunk = ""
-                    current_word_count = 0
-
-            # Add the piece to the current chunk
-            if current_word_count + piece_word_count > max_words and current_word_count >= min_words:
-                # If adding this piece exceeds max_words, finalize the current chunk
-                chunks.append(current_chunk.strip())
-                current_chunk = piece.strip()
-                current_word_count = piece_word_count
-            else:
-                current_chunk += piece + "\n"
-                current_word_count += piece_word_count
-
-        # Handle the last chunk
-        if current_chunk.strip():
-            if current_word_count < min_final_words and chunks:
-                # If the last chunk is too small, merge it with the previous chunk
-                chunks[-1] += "\n" + current_chunk.strip()
-            else:
-                # Otherwise, add it as a separate chunk
-                chunks.append(current_chunk.strip())
+    """Split content into chunks based on headers and word count constraints.
 
-        return chunks
+    The content is scanned once for paragraph breaks and h2-h4 headings, and the sections between
+    them are packed in order into chunks. A chunk is closed once it has min_words words and either
+    the next section starts with an h2 or adding it would go over max_words. A final chunk under
+    min_final_words is merged into the one before it. Chunks are tracked as (start, end) offsets
+    into content and only sliced out at the end.
 
-    # 1. Split by h2 headings
-    content_pieces = split_by_heading(content, '##')
-    chunks = create_chunks(content_pieces)
+    Returns a (text, word_count) tuple per chunk. Words are counted once per section, and chunk
+    counts are summed from those, since sections never break a word.
+    """
 
-    # 2. Further split large chunks by h3 if they exceed max_words
-    final_chunks = []
-    for chunk in chunks:
-        if word_count(chunk) > max_words:
-            sub_pieces = split_by_heading(chunk, '###')
-            sub_chunks = create_chunks(sub_pieces,'###')
-            
-            # 3. Further split large sub-chunks by h4 if they exceed max_words
-            for sub_chunk in sub_chunks:
-                if word_count(sub_chunk) > max_words:
-                    sub_sub_pieces = split_by_heading(sub_chunk, '####')
-                    sub_sub_chunks = create_chunks(sub_sub_pieces,'####')
-                    
-                    # 4. If still too large, split by paragraph
-                    for sub_sub_chunk in sub_sub_chunks:
-                        if word_count(sub_sub_chunk) > max_words:
-                            paragraphs = sub_sub_chunk.split('\n\n')
-                            paragraph_chunks = create_chunks(paragraphs)
-                            final_chunks.extend(paragraph_chunks)
-                        else:
-                            final_chunks.append(sub_sub_chunk)
-                else:
-                    final_chunks.append(sub_chunk)
+    # Helper function to count words
+    def word_count(start, end):
+        return len(content[start:end].split())
+
+    # 1. Find section boundaries, noting which ones start an h2
+    boundaries = [0]
+    h2_starts = set()
+    for match in SECTION_BREAK_RE.finditer(content):
+        if match.start() != boundaries[-1]:
+            boundaries.append(match.start())
+        if match.group(1) == '##':
+            h2_starts.add(match.start())
+    boundaries.append(len(content))
+
+    # 2. Pack sections greedily into chunks
+    chunks = []
+    chunk_start = chunk_end = None
+    chunk_words = 0
+    for start, end in zip(boundaries, boundaries[1:]):
+        words = word_count(start, end)
+        if chunk_start is not None and chunk_words >= min_words and (start in h2_starts or chunk_words + words > max_words):
+            chunks.append([chunk_start, chunk_end, chunk_words])
+            chunk_start = None
+            chunk_words = 0
+        if chunk_start is None:
+            chunk_start = start
+        chunk_end = end
+        chunk_words += words
+
+    # Handle the last chunk
+    if chunk_words:
+        if chunk_words < min_final_words and chunks:
+            # If the last chunk is too small, merge it with the previous chunk
+            chunks[-1][1] = chunk_end
+            chunks[-1][2] += chunk_words
         else:
-            final_chunks.append(chunk)
+            # Otherwise, add it as a separate chunk
+            chunks.append([chunk_start, chunk_end, chunk_words])
 
-    return final_chunks
+    return [(content[start:end].strip(), words) for start, end, words in chunks]
 
 
 def createChunk(text_snippet,WEBSITE_url,keywords,title):
-    chunk = Chunk(
+    chunk = Chunk.create(
         title        = title,
         url          = WEBSITE_url,
         uuid         = str(uuid.uuid4()),
@@ -641,63 +710,61 @@ def printChunks(chunks):
         print('='*100)
 
 
-def chunkSaveAndTrack(url,chunk):
+def flushDetails():
+    with open(details_file, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['URL','Date', 'Number of Words', 'Number of Chunks','Chunk IDs'])
+        writer.writerows(details_rows.values())
+
+
+def chunkFileName(url):
+    """Return the YAML file for url's chunks, named by a hash of the URL so distinct URLs never share a file."""
+    return f"{yaml_dir}/{hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]}.yaml"
+
+
+def writeChunkFile(url):
+    """Write every chunk recorded so far for url as the documents of its YAML file, with the URL in a header comment."""
+    with chunk_file_lock:
+        with state_lock:
+            chunks = list(chunks_by_url.get(url, ()))
+        if not chunks:
+            return
+        file_name = chunkFileName(url)
+        with open(file_name, 'wb') as file:
+            file.write(f"# url: {url}\n".encode('utf-8'))
+            yaml.dump_all(chunks, file, Dumper=SafeDumper, encoding='utf-8', default_flow_style=False, sort_keys=False)
+    print(f"{file_name} === {len(chunks)} chunks")
+
+
+def chunkSaveAndTrack(url,chunk,chunk_words=None):
+    """Save chunk and record it against url in the chunk details. chunk_words is counted from the content if not given."""
 
     def addNewRow(current_date,chunk_words,chunk_id):
-        return [url,current_date,chunk_words,'1',chunk_id]
+        return [url,current_date,chunk_words,1,chunk_id]
     
     def addToExistingRow(row,chunk_words,chunk_id):
-        url = row[0] # same URL
-        date = row[1] # same date
-        words = str(int(row[2]) + chunk_words) # update words
-        chunks = row[3] = str(int(row[3]) + 1) # update number of chunks
-        ids = row[4]+ f", {chunk_id}" # update chunk IDs
-        return [url,date,words,chunks,ids]
+        # URL and date stay the same
+        row[2] += chunk_words # update words
+        row[3] += 1 # update number of chunks
+        row[4] += f", {chunk_id}" # update chunk IDs
 
 
     def recordChunk():
         current_date = datetime.date.today().strftime('%Y-%m-%d')
-        chunk_words  = len(chunk.content.split())    
+        words        = chunk_words if chunk_words is not None else len(chunk.content.split())
         chunk_id     = f'chunk_{chunk.uuid}'
 
-        new_rows = []
-
-        with open(details_file, mode='r', newline='', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            try:
-                headers = next(csv_reader)  
-                new_rows.append(headers) # keep in memory
-            except StopIteration:
-                pass
-
-            url_found = False  # Track if the URL is found in any row
-            
-            # Loop through all the rows after the header
-            for row in csv_reader:
-                if row[0] == url:
-                    new_rows.append(addToExistingRow(row, chunk_words, chunk_id))  # Modify and append the row
-                    url_found = True  # Mark that the URL was found
-                else:
-                    new_rows.append(row)  # Append the row without modification
-            
-            # If the URL was not found, append a new row
-            if not url_found:
-                new_rows.append(addNewRow(current_date, chunk_words, chunk_id))
-
-
-        # Overwrite csv with new info
-        with open(details_file, mode='w', newline='') as file:
-            csv_writer = csv.writer(file, delimiter=',')
-            csv_writer.writerows(new_rows) 
-
-    # Save chunk
-    file_name = f"{yaml_dir}/chunk_{chunk.uuid}.yaml"
-    with open(file_name, 'w') as file:
-        yaml.dump(chunk.toDict(), file, default_flow_style=False, sort_keys=False)
+        row = details_rows.get(url)
+        if row is None:
+            details_rows[url] = addNewRow(current_date, words, chunk_id)
+        else:
+            addToExistingRow(row, words, chunk_id)
 
-    # Record chunk
-    recordChunk()
-    print(f"{file_name} === {chunk.title}")
+    # Save and record chunk
+    with state_lock:
+        chunks_by_url.setdefault(url, []).append(chunk.toDict())
+        recordChunk()
+    print(f"chunk_{chunk.uuid} === {chunk.title}")
 
 
 def main():
@@ -709,14 +776,17 @@ def main():
     # Argparse inputs
     parser = argparse.ArgumentParser(description="Turn a Learning Path URL into suburls in GitHub")
     parser.add_argument("csv_file", help="Path to the CSV file that lists all Learning Paths to chunk.")
+    parser.add_argument("--no-cache", action="store_true", help=f"Fetch every page again instead of reusing responses cached in {scrape_cache}.sqlite.")
     args = parser.parse_args()
 
+    global http_session
+    http_session = create_retry_session(cache_name=None if args.no_cache else scrape_cache)
+
     # 0) Initialize files
     os.makedirs(yaml_dir, exist_ok=True) # create if doesn't exist
     os.makedirs('info', exist_ok=True)   # create if doesn't exist
-    with open(details_file, mode='w', newline='') as file:
-        writer = csv.writer(file)        
-        writer.writerow(['URL','Date', 'Number of Words', 'Number of Chunks','Chunk IDs'])
+    atexit.register(flushDetails)
+    atexit.register(flushErrors)
 
     # 0) Obtain full database information:
     # a) Learning Paths & Install Guides
@@ -729,36 +799,39 @@ def main():
     #createIntrinsicsDatabaseChunks()
 
     # 1) Get URLs and details from CSV
-    csv_dict, csv_length = readInCSV(args.csv_file)
+    csv_rows = readInCSV(args.csv_file)
 
     print(f'Starting to loop over CSV file {args.csv_file} ......')
-    for i in range(csv_length):
-        url = csv_dict['urls'][i]
-        source_name = csv_dict['source_names'][i]
+    pages = []
+    for source_name, focus, url in csv_rows:
 
         # 2) Translate a URL into all it's individual page URLs, if applicable, as their raw GitHub MD files -->       https://raw.githubusercontent.com/ArmDeveloperEcosystem/arm-learning-paths/refs/heads/main/content/learning-paths/servers-and-cloud-computing/llama-cpu/llama-chatbot.md
         MARKDOWN_urls, WEBSITE_urls = getMarkdownGitHubURLsFromPage(url)
-        for j in range(len(MARKDOWN_urls)):
-            MARKDOWN_url = MARKDOWN_urls[j]
-            WEBSITE_url = WEBSITE_urls[j]
+        for MARKDOWN_url, WEBSITE_url in zip(MARKDOWN_urls, WEBSITE_urls):
+            # 3) Fetch every markdown file concurrently; chunking below stays in CSV order
+            markdown_future = markdown_executor.submit(obtainMarkdownContentFromGitHubMDFile, MARKDOWN_url)
+            pages.append((source_name, url, MARKDOWN_url, WEBSITE_url, markdown_future))
 
-            # 3) Extract markdown, skipping those that are 404ing
-            if not URLIsValidCheck(MARKDOWN_url):
-                print('not valid, ',MARKDOWN_url)
-                continue 
-            markdown = obtainMarkdownContentFromGitHubMDFile(MARKDOWN_url)
+    for source_name, url, MARKDOWN_url, WEBSITE_url, markdown_future in pages:
 
-            # 4) Get keywords (removing -)
-            keywords = [source_name.replace(" - ", " ").replace(" ", ", ")]
+        # 3) Extract markdown, skipping those that are 404ing
+        markdown = markdown_future.result()
+        if markdown is None:
+            print('not valid, ',MARKDOWN_url)
+            continue 
 
-            # 4) Get sized text snippets the markdown
-            text_snippets = obtainTextSnippets__Markdown(markdown)
+        # 4) Get keywords (removing -)
+        keywords = [source_name.replace(" - ", " ").replace(" ", ", ")]
 
-            # 5) Create chunks for each snippet by adding metadata 
-            for text_snippet in text_snippets:
-                chunk = createChunk(text_snippet, WEBSITE_url, keywords, source_name)
-                chunkSaveAndTrack(url,chunk) 
+        # 4) Get sized text snippets the markdown
+        text_snippets = obtainTextSnippets__Markdown(markdown)
+
+        # 5) Create chunks for each snippet by adding metadata 
+        for text_snippet, words in text_snippets:
+            chunk = createChunk(text_snippet, WEBSITE_url, keywords, source_name)
+            chunkSaveAndTrack(url,chunk,words) 
 
+        writeChunkFile(url)
 
 
 if __name__ == "__main__":
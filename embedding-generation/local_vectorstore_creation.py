@@ -12,18 +12,88 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import argparse
+import contextlib
 import yaml
 import numpy as np
 import math
-from typing import List, Dict, Tuple
-import json
+from typing import List, Dict, Tuple, Optional
+import orjson
 import os
 import glob
 import sys
 import datetime
-from sentence_transformers import SentenceTransformer
+import pickle
+import platform
+from concurrent.futures import ProcessPoolExecutor
+from tqdm import tqdm
+import torch
+from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+from sentence_transformers.models import StaticEmbedding
 from usearch.index import Index
 
+# Parsed chunks from the previous run, keyed by absolute file path and stored with the file's mtime.
+# Written to the working directory next to the index and metadata; bump CACHE_VERSION whenever
+# load_yaml_file's output changes so stale entries are thrown away.
+PARSED_CACHE_FILE = 'parsed_cache.pkl'
+CACHE_VERSION = 3
+
+# Transformer used for the index (and, with --static, distilled into a static model)
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Distilled static model saved next to the index by --static; metadata.json tells the server to encode queries with it
+STATIC_MODEL_DIR = 'static_model'
+
+# Prefer the libyaml C bindings for reading chunks, falling back to the pure-Python loader
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+# Only these top-level keys of each chunk are used to build the index, so only they are kept and cached
+CHUNK_KEYS = ('content', 'uuid', 'url', 'title', 'keywords')
+
+
+def load_yaml_file(file_path: str) -> Optional[List[Dict]]:
+    """Load every chunk in a YAML file, tagging each with its chunk_uuid. Returns None if the file can't be loaded."""
+    yaml_contents = []
+    try:
+        with open(file_path, 'r') as f:
+            # yaml_data files hold every chunk for a URL, one YAML document each
+            for document in yaml.load_all(f, Loader=SafeLoader):
+                yaml_content = {key: document[key] for key in CHUNK_KEYS if key in document}
+                # Extract chunk identifier based on file location
+                if file_path.startswith("intrinsic_chunks"):
+                    chunk_uuid = f"intrinsic_{os.path.basename(file_path).replace('.yaml', '')}"
+                elif file_path.startswith("yaml_data"):
+                    chunk_uuid = f"yaml_data_chunk_{yaml_content['uuid']}"
+                else:
+                    chunk_uuid = file_path.replace('chunk_', '').replace('.yaml', '')
+
+                yaml_content['chunk_uuid'] = chunk_uuid
+                yaml_contents.append(yaml_content)
+    except Exception as e:
+        tqdm.write(f"Error loading {file_path}: {e}")
+        return None
+    return yaml_contents
+
+
+def load_parsed_cache() -> Dict[str, Tuple[int, List[Dict]]]:
+    """Load the parsed chunks saved by the previous run, or an empty cache if there is none usable."""
+    try:
+        with open(PARSED_CACHE_FILE, 'rb') as f:
+            cache = pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Ignoring unreadable cache {PARSED_CACHE_FILE}: {e}")
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        print(f"Ignoring cache {PARSED_CACHE_FILE} written by a different parser version")
+        return {}
+    return cache['files']
+
 
 def load_local_yaml_files() -> List[Dict]:
     """Load locally stored YAML files and return their contents as a list of dictionaries."""
@@ -41,36 +111,143 @@ def load_local_yaml_files() -> List[Dict]:
     total_files = len(all_files)
     print(f"Total files to process: {total_files}")
 
-    for i, file_path in enumerate(all_files, 1):
-        print(f"Loading file {i}/{total_files}: {file_path}")
+    # Only parse files that are new or modified since the cache was written
+    cache = load_parsed_cache()
+    cache_keys = {file_path: os.path.abspath(file_path) for file_path in all_files}
+    mtimes = {file_path: os.stat(file_path).st_mtime_ns for file_path in all_files}
+    changed_files = [file_path for file_path in all_files if cache.get(cache_keys[file_path], (None,))[0] != mtimes[file_path]]
+    print(f"Reusing {total_files - len(changed_files)} cached files, parsing {len(changed_files)}")
 
-        # Extract chunk identifier based on file location
-        if file_path.startswith("intrinsic_chunks"):
-            chunk_uuid = f"intrinsic_{os.path.basename(file_path).replace('.yaml', '')}"
-        elif file_path.startswith("yaml_data"):
-            chunk_uuid = f"yaml_data_{os.path.basename(file_path).replace('.yaml', '')}"
-        else:
-            chunk_uuid = file_path.replace('chunk_', '').replace('.yaml', '')
+    # YAML parsing is CPU-bound, so spread the files over one process per core
+    parsed = {}
+    if changed_files:
+        with ProcessPoolExecutor() as pool:
+            results = pool.map(load_yaml_file, changed_files, chunksize=32)
+            for file_path, file_contents in zip(changed_files, tqdm(results, total=len(changed_files), desc="Loading YAML")):
+                parsed[file_path] = file_contents
 
-        try:
-            with open(file_path, 'r') as f:
-                yaml_content = yaml.safe_load(f)
-                yaml_content['chunk_uuid'] = chunk_uuid
-                yaml_contents.append(yaml_content)
-        except Exception as e:
-            print(f"Error loading {file_path}: {e}")
+    # Files that failed to load are left out of the cache so they are retried on the next run
+    new_cache = {}
+    for file_path in all_files:
+        file_contents = parsed[file_path] if file_path in parsed else cache[cache_keys[file_path]][1]
+        if file_contents is None:
             continue
+        new_cache[cache_keys[file_path]] = (mtimes[file_path], file_contents)
+        yaml_contents.extend(file_contents)
 
-    print(f"Successfully loaded {len(yaml_contents)} YAML files")
+    with open(PARSED_CACHE_FILE, 'wb') as f:
+        pickle.dump({'version': CACHE_VERSION, 'files': new_cache}, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Successfully loaded {len(yaml_contents)} chunks")
     return yaml_contents
 
 
-def create_embeddings(contents: List[str], model_name: str = 'all-MiniLM-L6-v2') -> np.ndarray:
-    """Create embeddings for the given contents using SentenceTransformers."""
-    print(f"Creating embeddings using model: {model_name}")
-    model = SentenceTransformer(model_name)
-    embeddings = model.encode(contents, show_progress_bar=True, convert_to_numpy=True)
-    print(f"Created embeddings with shape: {embeddings.shape}")
+def is_arm_host() -> bool:
+    return platform.machine().lower() in ('aarch64', 'arm64')
+
+
+def load_onnx_int8_model(model_name: str, num_threads: Optional[int] = None) -> SentenceTransformer:
+    """Load the model on the ONNX Runtime backend with dynamically quantized INT8 weights.
+
+    The quantized model is exported to '<model>-onnx-int8' on first use and reused after that.
+    ONNX Runtime runs each operator on num_threads threads (its own default if not given).
+    """
+    import onnxruntime
+    quantization_config = 'arm64' if is_arm_host() else 'avx2'
+    export_dir = f"{model_name.split('/')[-1]}-onnx-int8"
+    file_name = f"onnx/model_qint8_{quantization_config}.onnx"
+    if not os.path.exists(os.path.join(export_dir, file_name)):
+        print(f"Exporting {quantization_config} INT8 ONNX model to {export_dir}")
+        model = SentenceTransformer(model_name, backend='onnx')
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, quantization_config, export_dir)
+    session_options = onnxruntime.SessionOptions()
+    if num_threads:
+        session_options.intra_op_num_threads = num_threads
+    return SentenceTransformer(export_dir, backend='onnx', model_kwargs={'file_name': file_name, 'session_options': session_options})
+
+
+def quantize_model(model: SentenceTransformer) -> SentenceTransformer:
+    """Dynamically quantize the model's Linear layers to INT8 for faster CPU inference, keeping FP32 if that fails."""
+    engine = 'qnnpack' if is_arm_host() else 'fbgemm'
+    try:
+        torch.backends.quantized.engine = engine
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        print(f"Quantized model to INT8 using the {engine} engine")
+    except Exception as e:
+        print(f"INT8 quantization failed, using FP32 model: {e}")
+    return model
+
+
+def set_torch_threads(num_threads: int) -> None:
+    """Run PyTorch CPU work on num_threads threads, with half as many for inter-op parallelism."""
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(max(1, num_threads // 2))
+    except RuntimeError:
+        # Can only be set before PyTorch first runs parallel work in this process
+        pass
+
+
+def select_device() -> str:
+    """Return the fastest available torch device: CUDA, then Apple MPS, then CPU."""
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+
+def create_embeddings(contents: List[str], model_name: str = MODEL_NAME, batch_size: Optional[int] = None,
+                      num_threads: Optional[int] = None) -> np.ndarray:
+    """Create embeddings for the given contents using SentenceTransformers.
+
+    The model runs on a GPU when one is available, otherwise on the CPU as an INT8 model.
+    encode() sorts the contents by length before batching and restores the original order
+    afterwards, so each batch only pads to similarly sized texts; a large batch_size (by default
+    256 on CPU, 512 on GPU) keeps the per-batch overhead low on a corpus-sized encode. The CPU
+    encode, on ONNX Runtime or the PyTorch fallback, uses num_threads threads (all CPUs by default).
+    """
+    device = select_device()
+    batch_size = batch_size or (256 if device == 'cpu' else 512)
+    num_threads = num_threads or os.cpu_count()
+    print(f"Creating embeddings using model: {model_name} on {device} with {num_threads} threads")
+    if device == 'cpu':
+        try:
+            model = load_onnx_int8_model(model_name, num_threads)
+        except Exception as e:
+            print(f"ONNX Runtime backend unavailable, using PyTorch: {e}")
+            set_torch_threads(num_threads)
+            model = quantize_model(SentenceTransformer(model_name, device=device))
+    else:
+        set_torch_threads(num_threads)
+        model = SentenceTransformer(model_name, device=device)
+    # On CUDA, run the forward passes in FP16 on the tensor cores
+    precision = torch.autocast(device_type='cuda', dtype=torch.float16) if device == 'cuda' else contextlib.nullcontext()
+    with torch.inference_mode(), precision:
+        embeddings = model.encode(contents, batch_size=batch_size, show_progress_bar=True, convert_to_numpy=True)
+    # Half precision halves the size of everything built from the embeddings below
+    embeddings = embeddings.astype(np.float16)
+    print(f"Created embeddings with shape: {embeddings.shape} ({embeddings.dtype})")
+    return embeddings
+
+
+def create_static_embeddings(contents: List[str], model_name: str = MODEL_NAME, pca_dims: int = 256,
+                             batch_size: int = 1024) -> np.ndarray:
+    """Create embeddings with a model2vec static model distilled from model_name.
+
+    Distillation stores one vector per vocabulary token, so encoding is a token lookup and mean pool
+    with no transformer pass. Static embeddings live in their own space, so the distilled model is
+    saved to STATIC_MODEL_DIR and queries must be encoded with it too.
+    """
+    model_id = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+    print(f"Distilling static embeddings from {model_id} with {pca_dims} dimensions")
+    model = SentenceTransformer(modules=[StaticEmbedding.from_distillation(model_id, pca_dims=pca_dims)])
+    print(f"Saving static model to {STATIC_MODEL_DIR}")
+    model.save(STATIC_MODEL_DIR)
+    embeddings = model.encode(contents, batch_size=batch_size, show_progress_bar=True, convert_to_numpy=True)
+    embeddings = embeddings.astype(np.float16)
+    print(f"Created embeddings with shape: {embeddings.shape} ({embeddings.dtype})")
     return embeddings
 
 
@@ -81,30 +258,35 @@ def create_usearch_index(embeddings: np.ndarray, metadata: List[Dict]) -> Tuple[
     
     dimension = embeddings.shape[1]
     num_vectors = embeddings.shape[0]
+
+    # L2-normalize in FP32 so inner product equals cosine similarity; USearch stores the vectors as F16
+    embeddings = embeddings.astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
     
     # Create USearch index
     index = Index(
         ndim=dimension,
-        metric='l2sq',
-        dtype='f32',
+        metric='ip',
+        dtype='f16',
         connectivity=16,
         expansion_add=128,
         expansion_search=64
     )
     
-    # Add vectors to the index
+    # Add all vectors in one call, which USearch spreads across threads; keys are the metadata positions
     print(f"Adding {num_vectors} vectors to the index")
-    for i, embedding in enumerate(embeddings):
-        index.add(i, embedding)
-
-    for item, vec in zip(metadata, embeddings):
-        item['vector'] = vec.tolist()
+    keys = np.arange(num_vectors, dtype=np.uint64)
+    index.add(keys, np.ascontiguousarray(embeddings), threads=os.cpu_count())
     
     print(f"Added {len(index)} vectors to the index")
     return index, metadata
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Embed the local YAML chunks and build the USearch index")
+    parser.add_argument("--static", action="store_true", help=f"Embed with a model2vec static model distilled from the transformer and save it to {STATIC_MODEL_DIR} for query encoding (needs requirements-static.txt).")
+    args = parser.parse_args()
+
     print("Starting the USearch datastore creation process")
 
     # Load local YAML files
@@ -114,8 +296,7 @@ def main():
     print("Extracting content and metadata from YAML files")
     contents = []
     metadata = []
-    for i, yaml_content in enumerate(yaml_contents, 1):
-        print(f"Processing YAML content {i}/{len(yaml_contents)}")
+    for yaml_content in yaml_contents:
         contents.append(yaml_content['content'])
         metadata.append({
             'uuid': yaml_content['uuid'],
@@ -127,12 +308,17 @@ def main():
         })
 
     # Create embeddings
-    embeddings = create_embeddings(contents)
+    if args.static:
+        embeddings = create_static_embeddings(contents)
+    else:
+        embeddings = create_embeddings(contents)
+    # Recorded in metadata.json so the server encodes queries with the model that built the index
+    embedding_model = {'name': MODEL_NAME, 'static': args.static, 'ndim': int(embeddings.shape[1])}
 
     print("Saving embeddings to file")
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"embeddings_{timestamp}.txt"
-    np.savetxt(filename, embeddings)
+    filename = f"embeddings_{timestamp}.npy"
+    np.save(filename, embeddings)
 
     # Create USearch index
     print("Creating USearch index")
@@ -146,13 +332,15 @@ def main():
     # Save metadata
     metadata_filename = 'metadata.json'
     print(f"Saving metadata to {metadata_filename}")
-    with open(metadata_filename, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    with open(metadata_filename, 'wb') as f:
+        f.write(orjson.dumps({'embedding_model': embedding_model, 'chunks': metadata}, option=orjson.OPT_SERIALIZE_NUMPY))
 
     print("USearch index and metadata have been created and saved.")
     print(f"Total documents processed: {len(contents)}")
     print(f"USearch index saved to: {os.path.abspath(index_filename)}")
     print(f"Metadata saved to: {os.path.abspath(metadata_filename)}")
+    if args.static:
+        print(f"Static model saved to: {os.path.abspath(STATIC_MODEL_DIR)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
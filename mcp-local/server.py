@@ -14,9 +14,8 @@
 
 from fastmcp import FastMCP
 from typing import List, Dict, Any, Optional
-from sentence_transformers import SentenceTransformer
-from utils.config import METADATA_PATH, USEARCH_INDEX_PATH, MODEL_NAME, SUPPORTED_SCANNERS, DEFAULT_ARCH
-from utils.search_utils import load_metadata, load_usearch_index, embedding_search, deduplicate_urls
+from utils.config import METADATA_PATH, USEARCH_INDEX_PATH, SUPPORTED_SCANNERS, DEFAULT_ARCH
+from utils.search_utils import load_metadata, load_usearch_index, load_embedding_model, embedding_search, deduplicate_urls
 from utils.docker_utils import check_docker_image_architectures
 from utils.migrate_ease_utils import run_migrate_ease_scan
 from utils.skopeo_tool import skopeo_help, skopeo_inspect
@@ -28,9 +27,9 @@ from utils.error_handling import format_tool_error
 mcp = FastMCP("arm-mcp")
 
 # Load USearch index and metadata at module load time
-METADATA = load_metadata(METADATA_PATH)
+METADATA, EMBEDDING_MODEL_INFO = load_metadata(METADATA_PATH)
 USEARCH_INDEX = load_usearch_index(USEARCH_INDEX_PATH, METADATA)
-EMBEDDING_MODEL = SentenceTransformer(MODEL_NAME)
+EMBEDDING_MODEL = load_embedding_model(EMBEDDING_MODEL_INFO, USEARCH_INDEX)
 
 
 # error formatter now lives in utils/error_handling.py
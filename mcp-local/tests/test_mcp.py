@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import json
+import orjson
 import constants
 import os
 import time
@@ -27,66 +28,111 @@ def _encode_mcp_message(payload: dict) -> bytes:
     return (json.dumps(payload) + "\n").encode("utf-8")
 
 
-def _read_docker_frame(sock, timeout: float) -> bytes:
-    deadline = time.time() + timeout
-    header = b""
-    while len(header) < 8:
-        if time.time() > deadline:
-            raise TimeoutError("Timed out waiting for docker frame header.")
-        chunk = sock.recv(8 - len(header))
-        if not chunk:
-            time.sleep(0.01)
-            continue
-        header += chunk
-
-    # Docker frame format can be either in multiplexed (each frame prefixed with an 8-byte header) or raw mode.
-    # byte 0: stream type (0x01 = stdout, 0x02 = stderr)
-    # bytes 1-3: Reserved, always \x00\x00\x00
-    # bytes 4-7: Payload size (big-endian uint32)
-    # This checks on header if frame is multiplexed or in raw mode. If bytes 1-3 are not zeros, the data is likely raw/unframed output, 
-    # so the function returns it directly instead of trying to parse frame headers and extract payloads
-    if header[1:4] != b"\x00\x00\x00":
-        return header
-
-    size = int.from_bytes(header[4:8], "big")
-    payload = b""
-    while len(payload) < size:
-        if time.time() > deadline:
-            raise TimeoutError("Timed out waiting for docker frame payload.")
-        chunk = sock.recv(size - len(payload))
-        if not chunk:
-            time.sleep(0.01)
-            continue
-        payload += chunk
-    return payload
+class _McpStream:
+    """Reads newline-delimited MCP messages from an attached docker socket.
 
+    Received bytes are kept in persistent buffers across calls so that large reads
+    spanning several docker frames or messages are never lost.
+    """
 
-def _read_mcp_message(sock, timeout: float = 10.0) -> dict:
-    deadline = time.time() + timeout
-    buffer = b""
-    while True:
-        if time.time() > deadline:
-            raise TimeoutError("Timed out waiting for MCP response line.")
-        try:
-            frame = _read_docker_frame(sock, timeout)
-        except TimeoutError:
-            raise
-        buffer += frame
-        while b"\n" in buffer:
-            line, buffer = buffer.split(b"\n", 1)
-            if not line:
-                continue
-            try:
-                return json.loads(line.decode("utf-8"))
-            except json.JSONDecodeError:
-                idx = line.find(b"{")
-                if idx != -1:
-                    try:
-                        return json.loads(line[idx:].decode("utf-8"))
-                    except json.JSONDecodeError:
-                        continue
+    def __init__(self, sock):
+        self.sock = sock
+        self.raw = bytearray()
+        self.lines = bytearray()
 
-def test_mcp_stdio_transport_responds():
+    def _fill(self, deadline: float, what: str) -> None:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(f"Timed out waiting for docker frame {what}.")
+        # Block in recv until data arrives; the socket timeout raises TimeoutError when truly idle.
+        self.sock.settimeout(remaining)
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            raise ConnectionError(f"MCP container closed the socket while waiting for docker frame {what}.")
+        self.raw += chunk
+
+    def read_docker_frame(self, timeout: float) -> bytes:
+        deadline = time.time() + timeout
+        while len(self.raw) < 8:
+            self._fill(deadline, "header")
+
+        # Docker frame format can be either in multiplexed (each frame prefixed with an 8-byte header) or raw mode.
+        # byte 0: stream type (0x01 = stdout, 0x02 = stderr)
+        # bytes 1-3: Reserved, always \x00\x00\x00
+        # bytes 4-7: Payload size (big-endian uint32)
+        # This checks on header if frame is multiplexed or in raw mode. If bytes 1-3 are not zeros, the data is likely raw/unframed output, 
+        # so everything received so far is returned directly instead of trying to parse frame headers and extract payloads
+        if self.raw[1:4] != b"\x00\x00\x00":
+            payload = bytes(self.raw)
+            self.raw.clear()
+            return payload
+
+        size = int.from_bytes(self.raw[4:8], "big")
+        while len(self.raw) < 8 + size:
+            self._fill(deadline, "payload")
+        payload = bytes(self.raw[8:8 + size])
+        del self.raw[:8 + size]
+        return payload
+
+    def read_mcp_message(self, timeout: float = 10.0) -> dict:
+        deadline = time.time() + timeout
+        while True:
+            idx = self.lines.find(b"\n")
+            while idx != -1:
+                line = bytes(self.lines[:idx])
+                del self.lines[:idx + 1]
+                if line:
+                    try:
+                        return orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        start = line.find(b"{")
+                        if start != -1:
+                            try:
+                                return orjson.loads(line[start:])
+                            except orjson.JSONDecodeError:
+                                pass
+                idx = self.lines.find(b"\n")
+            if time.time() > deadline:
+                raise TimeoutError("Timed out waiting for MCP response line.")
+            self.lines += self.read_docker_frame(timeout)
+
+
+TOOL_REQUESTS = [
+    constants.CHECK_IMAGE_REQUEST,
+    constants.CHECK_SKOPEO_REQUEST,
+    constants.CHECK_NGINX_REQUEST,
+    constants.CHECK_MIGRATE_EASE_TOOL_REQUEST,
+    constants.CHECK_SYSREPORT_TOOL_REQUEST,
+    constants.CHECK_MCA_TOOL_REQUEST,
+]
+
+
+def _read_responses(stream: _McpStream, expected_ids: set, responses: dict, timeout: float = 10.0) -> None:
+    # JSON-RPC responses carry the request id, so in-flight requests can be matched in any order.
+    # Responses are stored as they arrive, so the ones read before a timeout or disconnect are kept.
+    deadline = time.time() + timeout
+    while time.time() < deadline and not expected_ids <= responses.keys():
+        message = stream.read_mcp_message(timeout=max(deadline - time.time(), 0.0))
+        if message.get("id") in expected_ids:
+            responses[message["id"]] = message
+    missing = expected_ids - responses.keys()
+    if missing:
+        raise TimeoutError(f"Timed out waiting for MCP response ids={sorted(missing)}.")
+
+
+def _tool_response(tool_responses: dict, request: dict) -> dict:
+    # Fail only the test for the tool whose call went unanswered or returned a JSON-RPC error
+    response = tool_responses[request["id"]]
+    if isinstance(response, str):
+        pytest.fail(response)
+    if "error" in response:
+        pytest.fail("Test Failed: MCP {} tool returned an error: {}".format(request["params"]["name"], json.dumps(response["error"], indent=2)))
+    return response
+
+
+@pytest.fixture(scope="session")
+def mcp_session():
+    # One container and socket are shared by every test in the session.
     image = os.getenv("MCP_IMAGE", constants.MCP_DOCKER_IMAGE)
     repo_root = Path(__file__).resolve().parents[1]
     print("\n***repo root: ", repo_root)
@@ -101,70 +147,91 @@ def test_mcp_stdio_transport_responds():
         )
         raw_socket = socket_wrapper._sock
         raw_socket.settimeout(10)
+        stream = _McpStream(raw_socket)
 
         raw_socket.sendall(_encode_mcp_message(constants.INIT_REQUEST))
-        response = _read_mcp_message(raw_socket, timeout=20)
-
-        #Check Container Init Test
-        assert response.get("id") == 1, "Test Failed: MCP initialize response id mismatch."
-        assert "result" in response, "Test Failed: MCP initialize response missing result field."
-        assert "serverInfo" in response["result"], "Test Failed: MCP initialize response missing serverInfo field."
+        init_response = stream.read_mcp_message(timeout=20)
         raw_socket.sendall(
             _encode_mcp_message({"jsonrpc": "2.0", "method": "initialized", "params": {}})
         )
+        yield raw_socket, stream, init_response
+
+
+@pytest.fixture(scope="session")
+def tool_responses(mcp_session) -> dict:
+    # Send all tool calls up front and collect the responses by id. A request left without a
+    # response maps to the reason instead, so a hung or crashed tool only fails its own test.
+    raw_socket, stream, _ = mcp_session
+    for request in TOOL_REQUESTS:
+        raw_socket.sendall(_encode_mcp_message(request))
+    responses = {}
+    reason = ""
+    try:
+        _read_responses(stream, {request["id"] for request in TOOL_REQUESTS}, responses, timeout=60 * len(TOOL_REQUESTS))
+    except (TimeoutError, ConnectionError) as e:
+        reason = str(e)
+    for request in TOOL_REQUESTS:
+        responses.setdefault(request["id"], "Test Failed: no response to MCP {} tool call (id={}): {}".format(request["params"]["name"], request["id"], reason))
+    return responses
+
+
+def test_mcp_stdio_transport_responds(mcp_session):
+    _, _, response = mcp_session
+    #Check Container Init Test
+    assert response.get("id") == 1, "Test Failed: MCP initialize response id mismatch."
+    assert "result" in response, "Test Failed: MCP initialize response missing result field."
+    assert "serverInfo" in response["result"], "Test Failed: MCP initialize response missing serverInfo field."
+    print("\n***Test Passed: arm-mcp container initilized and ran successfully")
+
+
+def test_check_image_tool(tool_responses):
+    #Check Image Tool Test
+    check_image_response = _tool_response(tool_responses, constants.CHECK_IMAGE_REQUEST)
+    assert check_image_response.get("result")["structuredContent"] == constants.EXPECTED_CHECK_IMAGE_RESPONSE, "Test Failed: MCP check_image tool failed: content mismatch. Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_IMAGE_RESPONSE,indent=2), json.dumps(check_image_response.get("result")["structuredContent"],indent=2))
+    print("\n***Test Passed: MCP check_image tool succeeded")
+
+
+def test_check_skopeo_tool(tool_responses):
+    #Check Skopeo Tool Test
+    check_skopeo_response = _tool_response(tool_responses, constants.CHECK_SKOPEO_REQUEST)
+    actual_architecture = json.loads(check_skopeo_response.get("result")["structuredContent"]["stdout"]).get("Architecture")
+    actual_os = json.loads(check_skopeo_response.get("result")["structuredContent"]["stdout"]).get("Os")
+    actual_status = check_skopeo_response.get("result")["structuredContent"].get("status")
+    assert actual_architecture == json.loads(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["stdout"]).get("Architecture"), "Test Failed: MCP check_skopeo tool failed: Architecture mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["Architecture"], actual_architecture)
+    assert actual_os == json.loads(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["stdout"]).get("Os"), "Test Failed: MCP check_skopeo tool failed: Os mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["Os"], actual_os)
+    assert actual_status == constants.EXPECTED_CHECK_SKOPEO_RESPONSE["status"], "Test Failed: MCP check_skopeo tool failed: Status mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["status"], actual_status)
+    print("\n***Test Passed: MCP check_skopeo tool succeeded")
+
+
+def test_check_nginx_query(tool_responses):
+    #Check NGINX Query Test
+    check_nginx_response = _tool_response(tool_responses, constants.CHECK_NGINX_REQUEST)
+    urls = json.dumps(check_nginx_response["result"]["structuredContent"])
+    assert any(expected in urls for expected in constants.EXPECTED_CHECK_NGINX_RESPONSE), "Test Failed: MCP check_nginx tool failed: content mismatch., Expected one of: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_NGINX_RESPONSE,indent=2), json.dumps(check_nginx_response.get("result")["structuredContent"],indent=2))
+    print("\n***Test Passed: MCP check_nginx tool succeeded")
+
+
+def test_check_migrate_ease_tool(tool_responses):
+    #Check Migrate Ease Tool Test
+    check_migrate_ease_tool_response = _tool_response(tool_responses, constants.CHECK_MIGRATE_EASE_TOOL_REQUEST)
+    #assert only the status field to avoid mismatches due to dynamic fields
+    assert check_migrate_ease_tool_response.get("result")["structuredContent"]["status"] == constants.EXPECTED_CHECK_MIGRATE_EASE_TOOL_RESPONSE_STATUS, "Test Failed: MCP check_migrate_ease_tool tool failed: status mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_MIGRATE_EASE_TOOL_RESPONSE_STATUS, check_migrate_ease_tool_response.get("result")["structuredContent"]["status"])
+    print("\n***Test Passed: MCP check_migrate_ease_tool tool succeeded")
+
+
+def test_check_sysreport_tool(tool_responses):
+    #Check Sysreport Tool Test
+    check_sysreport_response = _tool_response(tool_responses, constants.CHECK_SYSREPORT_TOOL_REQUEST)
+    assert check_sysreport_response.get("result")["structuredContent"] == constants.EXPECTED_CHECK_SYSREPORT_TOOL_RESPONSE, "Test Failed: MCP sysreport_instructions tool failed: content mismatch. Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_SYSREPORT_TOOL_RESPONSE,indent=2), json.dumps(check_sysreport_response.get("result")["structuredContent"],indent=2))
+    print("\n***Test Passed: MCP sysreport_instructions tool succeeded")
+
+
+def test_check_mca_tool(tool_responses):
+    #Check MCA Tool Test
+    check_mca_response = _tool_response(tool_responses, constants.CHECK_MCA_TOOL_REQUEST)
+    assert check_mca_response.get("result")["structuredContent"]["status"] == constants.EXPECTED_CHECK_MCA_TOOL_RESPONSE_STATUS, "Test Failed: MCP mca tool failed: status mismatch.Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_MCA_TOOL_RESPONSE_STATUS,indent=2), json.dumps(check_mca_response.get("result")["structuredContent"]["status"],indent=2))
+    print("\n***Test Passed: MCP mca tool succeeded")
+
 
-        def _read_response(expected_id: int, timeout: float = 10.0) -> dict:
-            deadline = time.time() + timeout
-            while time.time() < deadline:
-                message = _read_mcp_message(raw_socket, timeout=timeout)
-                if message.get("id") == expected_id:
-                    return message
-            raise TimeoutError(f"Timed out waiting for MCP response id={expected_id}.")
-
-        print("\n***Test Passed: arm-mcp container initilized and ran successfully")
-
-        #Check Image Tool Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_IMAGE_REQUEST))
-        check_image_response = _read_response(2, timeout=60)
-        assert check_image_response.get("result")["structuredContent"] == constants.EXPECTED_CHECK_IMAGE_RESPONSE, "Test Failed: MCP check_image tool failed: content mismatch. Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_IMAGE_RESPONSE,indent=2), json.dumps(check_image_response.get("result")["structuredContent"],indent=2))
-        print("\n***Test Passed: MCP check_image tool succeeded")
-
-        #Check Skopeo Tool Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_SKOPEO_REQUEST))
-        check_skopeo_response = _read_response(3, timeout=60)
-        actual_architecture = json.loads(check_skopeo_response.get("result")["structuredContent"]["stdout"]).get("Architecture")
-        actual_os = json.loads(check_skopeo_response.get("result")["structuredContent"]["stdout"]).get("Os")
-        actual_status = check_skopeo_response.get("result")["structuredContent"].get("status")
-        assert actual_architecture == json.loads(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["stdout"]).get("Architecture"), "Test Failed: MCP check_skopeo tool failed: Architecture mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["Architecture"], actual_architecture)
-        assert actual_os == json.loads(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["stdout"]).get("Os"), "Test Failed: MCP check_skopeo tool failed: Os mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["Os"], actual_os)
-        assert actual_status == constants.EXPECTED_CHECK_SKOPEO_RESPONSE["status"], "Test Failed: MCP check_skopeo tool failed: Status mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_SKOPEO_RESPONSE["status"], actual_status)
-        print("\n***Test Passed: MCP check_skopeo tool succeeded")
-
-        #Check NGINX Query Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_NGINX_REQUEST))
-        check_nginx_response = _read_response(4, timeout=60)
-        urls = json.dumps(check_nginx_response["result"]["structuredContent"])
-        assert any(expected in urls for expected in constants.EXPECTED_CHECK_NGINX_RESPONSE), "Test Failed: MCP check_nginx tool failed: content mismatch., Expected one of: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_NGINX_RESPONSE,indent=2), json.dumps(check_nginx_response.get("result")["structuredContent"],indent=2))
-        print("\n***Test Passed: MCP check_nginx tool succeeded")
-
-        #Check Migrate Ease Tool Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_MIGRATE_EASE_TOOL_REQUEST))
-        check_migrate_ease_tool_response = _read_response(5, timeout=60)
-        #assert only the status field to avoid mismatches due to dynamic fields
-        assert check_migrate_ease_tool_response.get("result")["structuredContent"]["status"] == constants.EXPECTED_CHECK_MIGRATE_EASE_TOOL_RESPONSE_STATUS, "Test Failed: MCP check_migrate_ease_tool tool failed: status mismatch. Expected: {}, Received: {}".format(constants.EXPECTED_CHECK_MIGRATE_EASE_TOOL_RESPONSE_STATUS, check_migrate_ease_tool_response.get("result")["structuredContent"]["status"])
-        print("\n***Test Passed: MCP check_migrate_ease_tool tool succeeded")
-
-        #Check Sysreport Tool Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_SYSREPORT_TOOL_REQUEST))
-        check_sysreport_response = _read_response(6, timeout=60)
-        assert check_sysreport_response.get("result")["structuredContent"] == constants.EXPECTED_CHECK_SYSREPORT_TOOL_RESPONSE, "Test Failed: MCP sysreport_instructions tool failed: content mismatch. Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_SYSREPORT_TOOL_RESPONSE,indent=2), json.dumps(check_sysreport_response.get("result")["structuredContent"],indent=2))
-        print("\n***Test Passed: MCP sysreport_instructions tool succeeded")
-
-        #Check MCA Tool Test
-        raw_socket.sendall(_encode_mcp_message(constants.CHECK_MCA_TOOL_REQUEST))
-        check_mca_response = _read_response(7, timeout=60)
-        assert check_mca_response.get("result")["structuredContent"]["status"] == constants.EXPECTED_CHECK_MCA_TOOL_RESPONSE_STATUS, "Test Failed: MCP mca tool failed: status mismatch.Expected: {}, Received: {}".format(json.dumps(constants.EXPECTED_CHECK_MCA_TOOL_RESPONSE_STATUS,indent=2), json.dumps(check_mca_response.get("result")["structuredContent"]["status"],indent=2))
-        print("\n***Test Passed: MCP mca tool succeeded")
-        
 if __name__ == "__main__":
     pytest.main([__file__])
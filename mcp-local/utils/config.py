@@ -21,8 +21,11 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(os.path.dirname(BASE_DIR), "data")
 USEARCH_INDEX_PATH = os.path.join(DATA_DIR, "usearch_index.bin")
 METADATA_PATH = os.path.join(DATA_DIR, "metadata.json")
+# Shipped when metadata.json records that the index was built with a static embedding model
+STATIC_MODEL_PATH = os.path.join(DATA_DIR, "static_model")
 MODEL_NAME = 'all-MiniLM-L6-v2'
-DISTANCE_THRESHOLD = 1.1
+# Inner product distance (1 - cosine similarity) on normalized embeddings
+DISTANCE_THRESHOLD = 0.55
 K_RESULTS = 5
 
 # Docker architecture checking configuration
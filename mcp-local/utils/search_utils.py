@@ -12,12 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from usearch.index import Index
 import json
 import numpy as np
 from sentence_transformers import SentenceTransformer
-from .config import USEARCH_INDEX_PATH, METADATA_PATH, MODEL_NAME, DISTANCE_THRESHOLD, K_RESULTS
+from .config import USEARCH_INDEX_PATH, METADATA_PATH, MODEL_NAME, STATIC_MODEL_PATH, DISTANCE_THRESHOLD, K_RESULTS
 import os
 
 
@@ -29,32 +29,40 @@ def load_usearch_index(index_path: str, metadata: List[Dict]) -> Index:
     if not metadata:
         print("Error: Knowledge base metadata is missing or invalid.")
         return None
-    # Get dimension from the first metadata entry's vector
-    dimension = len(metadata[0]['vector'])
-    
-    # Create index with same parameters as used during creation
-    index = Index(
-        ndim=dimension,
-        metric='l2sq',  # L2 squared distance
-        dtype='f32',
-        connectivity=16,
-        expansion_add=128,
-        expansion_search=64
-    )
-    
-    # Load the saved index
-    index.load(index_path)
+    # The index file records the dimensions, metric and dtype it was created with
+    index = Index.restore(index_path)
+    if index is None:
+        print(f"Error: USearch index file '{index_path}' could not be read.")
+        return None
     return index
 
 
-def load_metadata(metadata_path: str) -> List[Dict]:
-    """Load metadata from JSON file."""
+def load_embedding_model(model_info: Dict, usearch_index: Index) -> SentenceTransformer:
+    """Load the query model recorded in the metadata, failing fast if its output size doesn't match the index."""
+    if model_info.get("static"):
+        if not os.path.isdir(STATIC_MODEL_PATH):
+            raise FileNotFoundError(f"The index was built with static embeddings but '{STATIC_MODEL_PATH}' does not exist.")
+        print(f"Using static embedding model from '{STATIC_MODEL_PATH}'")
+        model = SentenceTransformer(STATIC_MODEL_PATH)
+    else:
+        model = SentenceTransformer(model_info.get("name", MODEL_NAME))
+    ndim = model.get_sentence_embedding_dimension()
+    if usearch_index is not None and ndim != usearch_index.ndim:
+        raise ValueError(f"Query model produces {ndim}-dimensional embeddings but the USearch index has {usearch_index.ndim}; rebuild the index or ship the model it was built with.")
+    return model
+
+
+def load_metadata(metadata_path: str) -> Tuple[List[Dict], Dict]:
+    """Load the chunk metadata and the embedding model record from JSON file."""
     if not os.path.exists(metadata_path):
         print(f"Error: Metadata file '{metadata_path}' does not exist.")
-        return []
+        return [], {}
     with open(metadata_path, 'r') as f:
         metadata = json.load(f)
-    return metadata
+    # Files written before the model was recorded are a bare list of chunks embedded with MODEL_NAME
+    if isinstance(metadata, list):
+        return metadata, {"name": MODEL_NAME, "static": False}
+    return metadata["chunks"], metadata["embedding_model"]
 
 
 def embedding_search(
@@ -65,8 +73,8 @@ def embedding_search(
     k: int = K_RESULTS
 ) -> List[Dict[str, Any]]:
     """Search the USearch index with a text query."""
-    # Create query embedding
-    query_embedding = embedding_model.encode([query])[0]
+    # Create query embedding, normalized like the indexed vectors so inner product distance is 1 - cosine
+    query_embedding = embedding_model.encode([query], normalize_embeddings=True)[0]
     
     # Search in USearch index
     matches = usearch_index.search(query_embedding, k)